@@ -1,9 +1,16 @@
+import asyncio
+import itertools
 import random
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Union
 from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import partial
 import logging
-from datetime import datetime
 
 # Set up logging with a simpler format
 logging.basicConfig(
@@ -12,34 +19,132 @@ logging.basicConfig(
 )
 logger = logging.getLogger("disaster_response_system")
 
+# Per-agent inbox capacity; messages to a full inbox are dropped
+INBOX_MAXSIZE = 1024
+# Readings retained per analytics data source
+DATA_HISTORY_MAXLEN = 1024
+# Messages retained in each agent's local message log
+MESSAGE_LOG_MAXLEN = 1024
+# Skills drawn from when generating demo volunteers
+VOLUNTEER_SKILLS = ("medical", "logistics", "rescue", "communication", "engineering")
+
+# Agent identities, used as indexes into the broker's subscriber table
+class AgentId(IntEnum):
+    RELIEF_COORDINATOR = 0
+    VOLUNTEER_COORDINATOR = 1
+    COMMUNICATION = 2
+    ANALYTICS = 3
+    
+    def __str__(self) -> str:
+        return self.name.lower()
+
+
+# Message Contents
+@dataclass(slots=True)
+class RequestAreaAssessment:
+    disaster_type: str
+    location: str
+
+
+@dataclass(slots=True)
+class NeedAssessment:
+    area_data: List[Dict[str, Any]]
+
+
+@dataclass(slots=True)
+class NewAllocationPlan:
+    plan: List[Tuple[str, str, int]]
+
+
+@dataclass(slots=True)
+class VolunteerStatus:
+    total_volunteers: int
+
+
+@dataclass(slots=True)
+class CommunicationSystemStatus:
+    status: str
+    teams_connected: int
+
+
+@dataclass(slots=True)
+class WeatherData:
+    wind_speed: float = 0
+    rainfall: float = 0
+
+
+@dataclass(slots=True)
+class NewData:
+    source: str
+    data: Union[WeatherData, Dict[str, Any]]
+
+
+@dataclass(slots=True)
+class Alert:
+    alert_type: str
+    message: str
+    areas_affected: List[str] = field(default_factory=list)
+    recommended_actions: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class EmergencyAlert:
+    alert_type: str
+    message: str
+    areas_affected: List[str] = field(default_factory=list)
+    recommended_actions: List[str] = field(default_factory=list)
+
+
 # Base Agent Class
 class Agent(ABC):
-    def __init__(self, agent_id: str, name: str, message_broker):
+    __slots__ = ("agent_id", "name", "message_broker", "logger", "messages", "inbox", "_handlers")
+    
+    def __init__(self, agent_id: AgentId, name: str, message_broker):
         self.agent_id = agent_id
         self.name = name
         self.message_broker = message_broker
         self.logger = logging.getLogger(f"disaster_response_system.{self.agent_id}")
-        self.messages = []
+        self.messages = deque(maxlen=MESSAGE_LOG_MAXLEN)
+        self.inbox = asyncio.Queue(maxsize=INBOX_MAXSIZE)
+        # Content class -> handler; subclasses register the message types they act on
+        self._handlers = {}
         
-    def send_message(self, to_agent_id: str, message_content: Dict[str, Any]) -> None:
+    def send_message(self, to_agent_id: Union[AgentId, str], message_content: Any) -> None:
         message = {
             "from": self.agent_id,
             "to": to_agent_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time_ns(),
             "content": message_content
         }
         self.messages.append(message)
-        self.logger.debug(f"Message sent to {to_agent_id}: {message_content}")  # Debug level for details
+        self.logger.debug("Message sent to %s: %s", to_agent_id, message_content)  # Debug level for details
         self.message_broker.publish_message(message)
         
-    def receive_message(self, message: Dict[str, Any]) -> None:
-        self.messages.append(message)
-        self.logger.debug(f"Message received from {message['from']}: {message['content']}")
-        self.process_message(message)
+    def send_messages(self, batch: List[Tuple[Union[AgentId, str], Any]]) -> None:
+        timestamp = time.time_ns()
+        messages = [
+            {"from": self.agent_id, "to": to_agent_id, "timestamp": timestamp, "content": message_content}
+            for to_agent_id, message_content in batch
+        ]
+        self.messages.extend(messages)
+        self.logger.debug("Sent batch of %s messages", len(messages))
+        self.message_broker.publish_batch(messages)
+        
+    async def listen(self) -> None:
+        while True:
+            message = await self.inbox.get()
+            try:
+                self.process_message(message)
+            except Exception:
+                # Keep serving the inbox; a dead listener would leave later messages undelivered
+                self.logger.exception("Failed to handle %s from %s", type(message["content"]).__name__, message["from"])
+            finally:
+                self.inbox.task_done()
         
-    @abstractmethod
     def process_message(self, message: Dict[str, Any]) -> None:
-        pass
+        handler = self._handlers.get(type(message["content"]))
+        if handler is not None:
+            handler(message)
     
     @abstractmethod
     def run(self) -> None:
@@ -48,25 +153,69 @@ class Agent(ABC):
 
 # Message Broker
 class MessageBroker:
+    __slots__ = ("subscribers", "logger", "_loop", "_loop_thread")
+    
     def __init__(self):
-        self.subscribers = {}
+        self.subscribers: List[Optional[asyncio.Queue]] = [None] * len(AgentId)
         self.logger = logging.getLogger("disaster_response_system.message_broker")
+        self._loop = None
+        self._loop_thread = None
+        
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        # Call from the loop's own thread; publishes from other threads are handed off to it
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
         
-    def subscribe(self, agent_id: str, callback):
-        self.subscribers[agent_id] = callback
-        self.logger.debug(f"Agent {agent_id} subscribed")  # Debug level
+    def subscribe(self, agent_id: AgentId, inbox: asyncio.Queue):
+        self.subscribers[agent_id] = inbox
+        self.logger.debug("Agent %s subscribed", agent_id)  # Debug level
         
     def publish_message(self, message: Dict[str, Any]):
         recipient = message["to"]
-        if recipient in self.subscribers:
-            self.subscribers[recipient](message)
-            self.logger.debug(f"Message delivered to {recipient}")
-        else:
-            self.logger.warning(f"No subscriber for {recipient}")
+        inbox = self._inbox_for(recipient)
+        if inbox is None:
+            self.logger.warning("No subscriber for %s", recipient)
+            return
+        self._enqueue(recipient, inbox, [message])
+            
+    def publish_batch(self, messages: List[Dict[str, Any]]):
+        by_recipient = {}
+        for message in messages:
+            by_recipient.setdefault(message["to"], []).append(message)
+        for recipient, recipient_messages in by_recipient.items():
+            inbox = self._inbox_for(recipient)
+            if inbox is None:
+                self.logger.warning("No subscriber for %s", recipient)
+                continue
+            self._enqueue(recipient, inbox, recipient_messages)
+            
+    def _inbox_for(self, recipient: Union[AgentId, str]) -> Optional[asyncio.Queue]:
+        # Only registered agents have inboxes; other addresses (e.g. rescue teams) are unreachable
+        if not isinstance(recipient, AgentId):
+            return None
+        return self.subscribers[recipient]
+            
+    def _enqueue(self, recipient: AgentId, inbox: asyncio.Queue, messages: List[Dict[str, Any]]):
+        # asyncio queues are not thread-safe, so publishes from worker threads run on the loop
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            self._loop.call_soon_threadsafe(self._enqueue, recipient, inbox, messages)
+            return
+        dropped = 0
+        for message in messages:
+            try:
+                inbox.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumer: drop rather than block the publisher
+                dropped += 1
+        if dropped:
+            self.logger.warning("Inbox full for %s, %s messages dropped", recipient, dropped)
+        self.logger.debug("Queued %s messages for %s", len(messages) - dropped, recipient)
 
 
 # Disaster Context
 class DisasterContext:
+    __slots__ = ("disaster_type", "location", "severity", "affected_areas", "victims", "resources", "volunteers", "rescue_teams", "current_tasks", "data_sources", "logger")
+    
     def __init__(self, disaster_type: str, location: str, severity: int):
         self.disaster_type = disaster_type
         self.location = location
@@ -83,244 +232,279 @@ class DisasterContext:
 
 # Relief Coordinator Agent
 class ReliefCoordinatorAgent(Agent):
-    def __init__(self, agent_id: str, name: str, disaster_context: DisasterContext, message_broker):
+    __slots__ = ("disaster_context", "resource_allocation_plan", "priority_areas")
+    
+    def __init__(self, agent_id: AgentId, name: str, disaster_context: DisasterContext, message_broker):
         super().__init__(agent_id, name, message_broker)
         self.disaster_context = disaster_context
-        self.resource_allocation_plan = {}
-        self.priority_areas = []
+        self.resource_allocation_plan = []
+        self.priority_areas = {"names": [], "weights": []}
+        self._handlers[NeedAssessment] = self._handle_need_assessment
         
-    def process_message(self, message: Dict[str, Any]) -> None:
-        content = message["content"]
-        if content.get("type") == "need_assessment":
-            self.update_priority_areas(content["area_data"])
-            self.optimize_resource_allocation()
+    def _handle_need_assessment(self, message: Dict[str, Any]) -> None:
+        self.update_priority_areas(message["content"].area_data)
+        self.optimize_resource_allocation()
             
     def update_priority_areas(self, area_data: List[Dict[str, Any]]) -> None:
-        self.priority_areas = sorted(area_data, key=lambda x: (x["severity"] * x["population"]), reverse=True)
-        self.logger.info(f"Prioritized {len(self.priority_areas)} areas")
+        weights = [area["severity"] * area["population"] for area in area_data]
+        order = sorted(range(len(area_data)), key=weights.__getitem__, reverse=True)
+        self.priority_areas = {
+            "names": [area_data[i]["name"] for i in order],
+            "weights": [weights[i] for i in order]
+        }
+        self.logger.info("Prioritized %s areas", len(order))
     
     def update_resources(self, resources: Dict[str, int]) -> None:
         self.disaster_context.resources.update(resources)
-        self.logger.info(f"Resources initialized: {self.disaster_context.resources}")
+        self.logger.info("Resources initialized: %s", self.disaster_context.resources)
     
     def optimize_resource_allocation(self) -> None:
-        allocation_plan = {}
-        remaining_resources = self.disaster_context.resources.copy()
-        for area in self.priority_areas:
-            area_name = area["name"]
-            allocation_plan[area_name] = {}
-            total_priority_weight = sum(a["severity"] * a["population"] for a in self.priority_areas)
-            area_weight = (area["severity"] * area["population"]) / total_priority_weight if total_priority_weight > 0 else 0
-            for resource_type, total_quantity in remaining_resources.items():
+        allocation_plan: List[Tuple[str, str, int]] = []
+        resources = list(self.disaster_context.resources.items())
+        weights = self.priority_areas["weights"]
+        total_priority_weight = sum(weights)
+        area_weights = [w / total_priority_weight for w in weights] if total_priority_weight > 0 else [0] * len(weights)
+        for area_name, area_weight in zip(self.priority_areas["names"], area_weights):
+            # Area shares sum to at most 1, so allocating from the totals never overcommits a resource
+            for resource_type, total_quantity in resources:
                 allocated_quantity = int(total_quantity * area_weight)
                 if allocated_quantity > 0:
-                    allocation_plan[area_name][resource_type] = allocated_quantity
-                    remaining_resources[resource_type] -= allocated_quantity
+                    allocation_plan.append((area_name, resource_type, allocated_quantity))
         self.resource_allocation_plan = allocation_plan
-        self.logger.info(f"Created allocation plan for {len(allocation_plan)} areas")
-        self.send_message("volunteer_coordinator", {"type": "new_allocation_plan", "plan": allocation_plan})
+        self.logger.info("Created allocation plan for %s areas", len(self.priority_areas['names']))
+        self.send_message(AgentId.VOLUNTEER_COORDINATOR, NewAllocationPlan(allocation_plan))
     
     def run(self) -> None:
-        self.logger.info(f"{self.name} started")
+        self.logger.info("%s started", self.name)
         initial_resources = {"food": 1000, "water": 5000, "medical_supplies": 500, "shelter_kits": 200, "blankets": 1000}
         self.update_resources(initial_resources)
-        self.send_message("analytics", {"type": "request_area_assessment", "disaster_type": self.disaster_context.disaster_type, "location": self.disaster_context.location})
+        self.send_message(AgentId.ANALYTICS, RequestAreaAssessment(self.disaster_context.disaster_type, self.disaster_context.location))
 
 
 # Volunteer Coordinator Agent
 class VolunteerCoordinationAgent(Agent):
-    def __init__(self, agent_id: str, name: str, disaster_context: DisasterContext, message_broker):
+    __slots__ = ("disaster_context", "available_volunteers", "skills_registry", "task_assignments", "pending_tasks", "_task_seq")
+    
+    def __init__(self, agent_id: AgentId, name: str, disaster_context: DisasterContext, message_broker):
         super().__init__(agent_id, name, message_broker)
         self.disaster_context = disaster_context
         self.available_volunteers = {}
-        self.skills_registry = {}
+        self.skills_registry = defaultdict(set)
         self.task_assignments = {}
         self.pending_tasks = []
+        self._task_seq = itertools.count()
+        self._handlers[NewAllocationPlan] = self._handle_new_allocation_plan
     
-    def process_message(self, message: Dict[str, Any]) -> None:
-        content = message["content"]
-        if content.get("type") == "new_allocation_plan":
-            self.generate_distribution_tasks(content["plan"])
+    def _handle_new_allocation_plan(self, message: Dict[str, Any]) -> None:
+        self.generate_distribution_tasks(message["content"].plan)
     
     def register_volunteer(self, volunteer: Dict[str, Any]) -> None:
         volunteer_id = volunteer["id"]
         self.available_volunteers[volunteer_id] = volunteer
         for skill in volunteer["skills"]:
-            if skill not in self.skills_registry:
-                self.skills_registry[skill] = []
-            self.skills_registry[skill].append(volunteer_id)
-        self.logger.debug(f"Registered volunteer {volunteer_id}")
+            self.skills_registry[skill].add(volunteer_id)
+        self.logger.debug("Registered volunteer %s", volunteer_id)
     
-    def generate_distribution_tasks(self, allocation_plan: Dict[str, Dict[str, int]]) -> None:
+    def generate_distribution_tasks(self, allocation_plan: List[Tuple[str, str, int]]) -> None:
         tasks_created = 0
-        for area, resources in allocation_plan.items():
-            for resource_type, quantity in resources.items():
-                task = {
-                    "id": f"dist_{area}_{resource_type}_{int(time.time())}",
-                    "type": "resource_distribution",
-                    "description": f"Distribute {quantity} {resource_type} to {area}",
-                    "location": area,
-                    "resources": {resource_type: quantity},
-                    "required_skills": ["logistics"],
-                    "priority": 3
-                }
-                self.pending_tasks.append(task)
-                tasks_created += 1
-        self.logger.info(f"Generated {tasks_created} distribution tasks")
+        for area, resource_type, quantity in allocation_plan:
+            task = {
+                "id": f"dist_{area}_{resource_type}_{next(self._task_seq)}",
+                "type": "resource_distribution",
+                "description": f"Distribute {quantity} {resource_type} to {area}",
+                "location": area,
+                "resources": {resource_type: quantity},
+                "required_skills": ["logistics"],
+                "priority": 3
+            }
+            self.pending_tasks.append(task)
+            tasks_created += 1
+        self.logger.info("Generated %s distribution tasks", tasks_created)
     
     def run(self) -> None:
-        self.logger.info(f"{self.name} started")
+        self.logger.info("%s started", self.name)
+        skill_counts = random.choices((1, 2, 3), k=20)
         demo_volunteers = [
-            {"id": f"vol_{i}", "name": f"Volunteer {i}", "skills": random.sample(["medical", "logistics", "rescue", "communication", "engineering"], k=random.randint(1, 3)), "location": "Base Camp", "available": True}
-            for i in range(1, 21)
+            {"id": f"vol_{i}", "name": f"Volunteer {i}", "skills": random.sample(VOLUNTEER_SKILLS, k=k), "location": "Base Camp", "available": True}
+            for i, k in enumerate(skill_counts, start=1)
         ]
         for volunteer in demo_volunteers:
             self.register_volunteer(volunteer)
-        self.logger.info(f"Registered {len(demo_volunteers)} volunteers")
-        self.send_message("communication", {"type": "volunteer_status", "total_volunteers": len(self.available_volunteers)})
+        self.logger.info("Registered %s volunteers", len(demo_volunteers))
+        self.send_message(AgentId.COMMUNICATION, VolunteerStatus(len(self.available_volunteers)))
 
 
 # Communication Agent
 class CommunicationAgent(Agent):
-    def __init__(self, agent_id: str, name: str, disaster_context: DisasterContext, message_broker):
+    __slots__ = ("disaster_context", "victim_requests", "rescue_team_locations", "message_log", "priority_messages")
+    
+    def __init__(self, agent_id: AgentId, name: str, disaster_context: DisasterContext, message_broker):
         super().__init__(agent_id, name, message_broker)
         self.disaster_context = disaster_context
         self.victim_requests = {}
         self.rescue_team_locations = {}
-        self.message_log = []
-        self.priority_messages = []
+        self.message_log = deque(maxlen=MESSAGE_LOG_MAXLEN)
+        self.priority_messages = deque(maxlen=MESSAGE_LOG_MAXLEN)
+        self._handlers[Alert] = self._handle_alert
     
-    def process_message(self, message: Dict[str, Any]) -> None:
-        content = message["content"]
-        if content.get("type") == "alert":
-            self.broadcast_alert(content)
+    def _handle_alert(self, message: Dict[str, Any]) -> None:
+        self.broadcast_alert(message["content"])
     
     def update_team_location(self, team_id: str, location: Dict[str, float]) -> None:
         self.rescue_team_locations[team_id] = location
-        self.logger.debug(f"Updated team {team_id} location")
-    
-    def broadcast_alert(self, alert: Dict[str, Any]) -> None:
-        alert_message = {
-            "type": "emergency_alert",
-            "alert_type": alert["alert_type"],
-            "message": alert["message"],
-            "areas_affected": alert.get("areas_affected", []),
-            "recommended_actions": alert.get("recommended_actions", [])
-        }
-        for team_id in self.rescue_team_locations:
-            self.send_message(f"rescue_team_{team_id}", alert_message)
-        self.send_message("volunteer_coordinator", alert_message)
-        self.logger.info(f"Broadcasted {alert['alert_type']} alert")
+        self.logger.debug("Updated team %s location", team_id)
+    
+    def broadcast_alert(self, alert: Alert) -> None:
+        alert_message = EmergencyAlert(alert.alert_type, alert.message, alert.areas_affected, alert.recommended_actions)
+        batch = [(f"rescue_team_{team_id}", alert_message) for team_id in self.rescue_team_locations]
+        batch.append((AgentId.VOLUNTEER_COORDINATOR, alert_message))
+        self.send_messages(batch)
+        self.logger.info("Broadcasted %s alert", alert.alert_type)
     
     def run(self) -> None:
-        self.logger.info(f"{self.name} started")
-        demo_teams = {f"team_{i}": {"lat": 34.0522 + (random.random() - 0.5) * 0.1, "lon": -118.2437 + (random.random() - 0.5) * 0.1} for i in range(1, 6)}
+        self.logger.info("%s started", self.name)
+        uniform = random.uniform
+        demo_teams = {f"team_{i}": {"lat": 34.0522 + uniform(-0.05, 0.05), "lon": -118.2437 + uniform(-0.05, 0.05)} for i in range(1, 6)}
         for team_id, location in demo_teams.items():
             self.update_team_location(team_id, location)
-        self.logger.info(f"Initialized {len(demo_teams)} rescue teams")
-        self.send_message("analytics", {"type": "communication_system_status", "status": "operational", "teams_connected": len(self.rescue_team_locations)})
+        self.logger.info("Initialized %s rescue teams", len(demo_teams))
+        self.send_message(AgentId.ANALYTICS, CommunicationSystemStatus("operational", len(self.rescue_team_locations)))
 
 
 # Analytics & Prediction Agent
 class AnalyticsPredictionAgent(Agent):
-    def __init__(self, agent_id: str, name: str, disaster_context: DisasterContext, message_broker):
+    __slots__ = ("disaster_context", "data_sources", "predictions", "_prediction_seq", "_normalizers", "_detectors")
+    
+    def __init__(self, agent_id: AgentId, name: str, disaster_context: DisasterContext, message_broker):
         super().__init__(agent_id, name, message_broker)
         self.disaster_context = disaster_context
-        self.data_sources = {}
+        self.data_sources = defaultdict(partial(deque, maxlen=DATA_HISTORY_MAXLEN))
         self.predictions = {}
+        self._prediction_seq = itertools.count()
+        # Source -> converter from the dict form of a reading to its typed record
+        self._normalizers = {"weather": self._as_weather}
+        # Source -> significant-change test; sources without one never trigger predictions
+        self._detectors = {"weather": lambda data: data.wind_speed > 50}
+        self._handlers.update({
+            RequestAreaAssessment: self._handle_area_assessment,
+            NewData: self._handle_new_data
+        })
     
-    def process_message(self, message: Dict[str, Any]) -> None:
+    def _handle_area_assessment(self, message: Dict[str, Any]) -> None:
         content = message["content"]
-        if content.get("type") == "request_area_assessment":
-            area_assessment = self.assess_affected_areas(content["disaster_type"], content["location"])
-            self.send_message(message["from"], {"type": "need_assessment", "area_data": area_assessment})
-        elif content.get("type") == "new_data":
-            self.process_new_data(content["source"], content["data"])
-    
-    def process_new_data(self, source: str, data: Dict[str, Any]) -> None:
-        if source not in self.data_sources:
-            self.data_sources[source] = []
-        self.data_sources[source].append({"timestamp": datetime.now().isoformat(), "data": data})
-        self.logger.info(f"New {source} data received")
+        area_assessment = self.assess_affected_areas(content.disaster_type, content.location)
+        self.send_message(message["from"], NeedAssessment(area_assessment))
+    
+    def _handle_new_data(self, message: Dict[str, Any]) -> None:
+        content = message["content"]
+        self.process_new_data(content.source, content.data)
+    
+    def process_new_data(self, source: str, data: Union[WeatherData, Dict[str, Any]]) -> None:
+        normalizer = self._normalizers.get(source)
+        if normalizer is not None:
+            data = normalizer(data)
+        self.data_sources[source].append({"timestamp": time.time_ns(), "data": data})
+        self.logger.info("New %s data received", source)
         if self.detect_significant_change(source, data):
             prediction = self.generate_prediction({"source": source})
             if prediction["risk_level"] >= 7:
                 self.send_alert(prediction)
     
-    def detect_significant_change(self, source: str, data: Dict[str, Any]) -> bool:
-        if source == "weather" and data.get("wind_speed", 0) > 50:
-            return True
-        return False
+    @staticmethod
+    def _as_weather(data: Union[WeatherData, Dict[str, Any]]) -> WeatherData:
+        if isinstance(data, WeatherData):
+            return data
+        return WeatherData(data.get("wind_speed", 0), data.get("rainfall", 0))
+    
+    def detect_significant_change(self, source: str, data: Any) -> bool:
+        detector = self._detectors.get(source)
+        return detector is not None and detector(data)
     
     def generate_prediction(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         source = parameters.get("source", "all")
         if source == "weather":
             recent_data = self.get_recent_data("weather", 5)
-            avg_wind_speed = sum(d["data"].get("wind_speed", 0) for d in recent_data) / max(len(recent_data), 1)
-            avg_rainfall = sum(d["data"].get("rainfall", 0) for d in recent_data) / max(len(recent_data), 1)
+            sample_count = max(len(recent_data), 1)
+            avg_wind_speed = sum(d["data"].wind_speed for d in recent_data) / sample_count
+            avg_rainfall = sum(d["data"].rainfall for d in recent_data) / sample_count
             prediction = {
-                "id": f"pred_{int(time.time())}",
+                "id": f"pred_{next(self._prediction_seq)}",
                 "type": "weather_impact",
                 "risk_level": min(10, int(avg_wind_speed / 10)),
                 "areas_affected": ["Area A", "Area B"],
                 "recommended_actions": ["Evacuate high-risk areas", "Deploy additional rescue teams"]
             }
         else:
-            prediction = {"id": f"pred_{int(time.time())}", "type": "general", "risk_level": self.disaster_context.severity, "areas_affected": [], "recommended_actions": []}
+            prediction = {"id": f"pred_{next(self._prediction_seq)}", "type": "general", "risk_level": self.disaster_context.severity, "areas_affected": [], "recommended_actions": []}
         self.predictions[prediction["id"]] = prediction
-        self.logger.info(f"Generated prediction: Risk level {prediction['risk_level']}")
+        self.logger.info("Generated prediction: Risk level %s", prediction['risk_level'])
         return prediction
     
     def get_recent_data(self, source: str, count: int) -> List[Dict[str, Any]]:
-        if source not in self.data_sources or not self.data_sources[source]:
-            return []
-        all_source_data = sorted(self.data_sources[source], key=lambda x: datetime.fromisoformat(x.get("timestamp", "1970-01-01T00:00:00")), reverse=True)
-        return all_source_data[:min(count, len(all_source_data))]
+        # Newest readings are at the right end
+        return list(itertools.islice(reversed(self.data_sources.get(source, ())), count))
     
     def assess_affected_areas(self, disaster_type: str, location: str) -> List[Dict[str, Any]]:
         areas = [
             {"name": f"{location}_Area_{i}", "severity": random.randint(1, 10), "population": random.randint(100, 10000), "needs": ["food", "water", "medical_supplies"]}
             for i in range(1, 4)
         ]
-        self.logger.info(f"Assessed {len(areas)} affected areas")
+        self.logger.info("Assessed %s affected areas", len(areas))
         return areas
     
     def send_alert(self, prediction: Dict[str, Any]) -> None:
-        self.send_message("communication", {
-            "type": "alert",
-            "alert_type": prediction["type"],
-            "message": f"High risk detected: {prediction['risk_level']}/10",
-            "areas_affected": prediction["areas_affected"],
-            "recommended_actions": prediction["recommended_actions"]
-        })
+        self.send_message(AgentId.COMMUNICATION, Alert(
+            alert_type=prediction["type"],
+            message=f"High risk detected: {prediction['risk_level']}/10",
+            areas_affected=prediction["areas_affected"],
+            recommended_actions=prediction["recommended_actions"]
+        ))
     
     def run(self) -> None:
-        self.logger.info(f"{self.name} started")
+        self.logger.info("%s started", self.name)
 
 
 # Main execution
-def main():
+async def drain(agents: List[Agent]) -> None:
+    # Handling a message may enqueue more, so wait until every inbox is idle at once
+    while True:
+        for agent in agents:
+            await agent.inbox.join()
+        if all(agent.inbox.empty() for agent in agents):
+            return
+
+
+async def simulate():
+    loop = asyncio.get_running_loop()
     message_broker = MessageBroker()
+    message_broker.bind_loop(loop)
     disaster_context = DisasterContext("earthquake", "Los Angeles", 8)
     
-    relief_coordinator = ReliefCoordinatorAgent("relief_coordinator", "Relief Coordinator", disaster_context, message_broker)
-    volunteer_coordinator = VolunteerCoordinationAgent("volunteer_coordinator", "Volunteer Coordinator", disaster_context, message_broker)
-    communication = CommunicationAgent("communication", "Communication Agent", disaster_context, message_broker)
-    analytics = AnalyticsPredictionAgent("analytics", "Analytics Agent", disaster_context, message_broker)
+    relief_coordinator = ReliefCoordinatorAgent(AgentId.RELIEF_COORDINATOR, "Relief Coordinator", disaster_context, message_broker)
+    volunteer_coordinator = VolunteerCoordinationAgent(AgentId.VOLUNTEER_COORDINATOR, "Volunteer Coordinator", disaster_context, message_broker)
+    communication = CommunicationAgent(AgentId.COMMUNICATION, "Communication Agent", disaster_context, message_broker)
+    analytics = AnalyticsPredictionAgent(AgentId.ANALYTICS, "Analytics Agent", disaster_context, message_broker)
+    agents = [relief_coordinator, volunteer_coordinator, communication, analytics]
     
-    message_broker.subscribe("relief_coordinator", relief_coordinator.receive_message)
-    message_broker.subscribe("volunteer_coordinator", volunteer_coordinator.receive_message)
-    message_broker.subscribe("communication", communication.receive_message)
-    message_broker.subscribe("analytics", analytics.receive_message)
+    for agent in agents:
+        message_broker.subscribe(agent.agent_id, agent.inbox)
     
     logger.info("System initialized")
-    relief_coordinator.run()
-    volunteer_coordinator.run()
-    communication.run()
-    analytics.run()
+    # Start listeners only after start-up so handlers never race run()
+    with ThreadPoolExecutor(max_workers=len(agents)) as executor:
+        await asyncio.gather(*(loop.run_in_executor(executor, agent.run) for agent in agents))
+    listeners = [asyncio.create_task(agent.listen()) for agent in agents]
     
-    communication.send_message("analytics", {"type": "new_data", "source": "weather", "data": {"wind_speed": 60, "rainfall": 5}})
+    communication.send_message(AgentId.ANALYTICS, NewData("weather", WeatherData(wind_speed=60, rainfall=5)))
+    await drain(agents)
+    for listener in listeners:
+        listener.cancel()
+    await asyncio.gather(*listeners, return_exceptions=True)
     logger.info("Simulation completed")
 
+
+def main():
+    asyncio.run(simulate())
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()